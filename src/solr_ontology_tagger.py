@@ -62,36 +62,80 @@ def add_value_to_facet(facet, value, data = None ):
 	return data
 
 
+#
+# get all prefix paths of a taxonomy entry from a shared prefix tree of paths
+# (dictionary of parent path and part to path), so the path strings of common
+# upper prefixes are built and stored only once
+#
+def get_taxonomy_prefixes(taxonomy_entry, tree, separator="\t"):
+
+	prefixes = []
+
+	path = ''
+
+	for taxonomy_entry_part in taxonomy_entry.split(separator):
+
+		key = (path, taxonomy_entry_part)
+
+		prefix = tree.get(key)
+
+		# prefix not in tree yet, so build the path string once and add it
+		if prefix is None:
+			if len(path) > 0:
+				prefix = path + separator + taxonomy_entry_part
+			else:
+				prefix = taxonomy_entry_part
+			tree[key] = prefix
+
+		path = prefix
+
+		prefixes.append(path)
+
+	return prefixes
+
+
 #
 # split a taxonomy entry to separated index fields
 #
-def taxonomy2fields(taxonomy, field, separator="\t", subfields_suffix="_ss"):
+# path strings of upper prefixes are taken from the prefix tree, so if the same tree
+# is passed for the taxonomies of many concepts, common prefixes are built only once
+#
+def taxonomy2fields(taxonomy, field, separator="\t", subfields_suffix="_ss", tree=None):
+	"""
+	>>> taxonomy2fields("A\\tB", field='tag_ss')
+	{'tag_ss_taxonomy0_ss': ['A'], 'tag_ss_taxonomy1_ss': ['A\\tB']}
+	>>> taxonomy2fields(["\\tB", "A\\t\\tC"], field='tag_ss')
+	{'tag_ss_taxonomy0_ss': ['', 'A'], 'tag_ss_taxonomy1_ss': ['B', 'A\\t'], 'tag_ss_taxonomy2_ss': ['A\\t\\tC']}
+	>>> tree = {}
+	>>> taxonomy2fields("A\\tB", field='tag_ss', tree=tree)['tag_ss_taxonomy0_ss'][0] is taxonomy2fields("A\\tC", field='tag_ss', tree=tree)['tag_ss_taxonomy0_ss'][0]
+	True
+	"""
 
 	result = {}
 
+	if tree is None:
+		tree = {}
+
+	# fieldnames by taxonomy level
+	taxonomy_fieldnames = []
+
 	# if not multivalued field, convert to used list/array structure
 	if not isinstance(taxonomy, list):
 		taxonomy = [taxonomy]
 
 	for taxonomy_entry in taxonomy:
 
-		i = 0
-		path = ''
-		for taxonomy_entry_part in taxonomy_entry.split(separator):
-
-			taxonomy_fieldname = field + '_taxonomy' + str(i) + subfields_suffix
+		for i, path in enumerate(get_taxonomy_prefixes(taxonomy_entry, tree, separator=separator)):
 
-			if not taxonomy_fieldname in result:
-				result[taxonomy_fieldname] = []
+			if i == len(taxonomy_fieldnames):
+				taxonomy_fieldnames.append(field + '_taxonomy' + str(i) + subfields_suffix)
 
-			if len(path) > 0:
-				path += separator
-
-			path += taxonomy_entry_part
-
-			result[taxonomy_fieldname].append(path)
+			taxonomy_fieldname = taxonomy_fieldnames[i]
 
-			i += 1
+			if taxonomy_fieldname in result:
+				result[taxonomy_fieldname].append(path)
+			else:
+				result[taxonomy_fieldname] = [path]
 
 	return result
 
@@ -353,7 +397,7 @@ class OntologyTagger(Graph):
 	# add concept with URI/subject s to entities index and to target_facet of documents including at least one of the labels
 	#
 
-	def import_entity(self, s, target_facet='tag_ss', queryfields="_text_", lang='en', narrower=True):
+	def import_entity(self, s, target_facet='tag_ss', queryfields="_text_", lang='en', narrower=True, taxonomy_tree=None):
 			
 		# get all Labels for this subject
 		labels = self.get_labels(s)
@@ -463,9 +507,7 @@ class OntologyTagger(Graph):
 
 					if self.synonyms_embed_to_document:
 
-						for label in labels:
-		
-							tagdata = add_value_to_facet(facet = target_facet + '_synonyms_ss', value = label, data=tagdata)
+						tagdata[target_facet + '_synonyms_ss'] = list(labels)
 						
 					if self.synonyms_configfile:
 							append_labels_to_synonyms_configfile(labels, self.synonyms_configfile)
@@ -480,9 +522,8 @@ class OntologyTagger(Graph):
 				# build lucene query to search for at least one label of all labels
 				query = labels_to_query(labels)
 
-				separated_taxonomy_fields = taxonomy2fields(taxonomy=taxonomy, field=target_facet)
-				for separated_taxonomy_field in separated_taxonomy_fields:
-					add_value_to_facet(facet=separated_taxonomy_field, value=separated_taxonomy_fields[separated_taxonomy_field], data=tagdata)
+				# prefix tree shared by all concepts, so common upper paths are built only once
+				tagdata.update( taxonomy2fields(taxonomy=taxonomy, field=target_facet, tree=taxonomy_tree) )
 
 		
 				# tag (add facets and values) documents matching this query with this URIs & labels
@@ -582,13 +623,16 @@ class OntologyTagger(Graph):
 	          ?subject ?predicate ?object .
 	       }""")
 	
+		# prefix tree of taxonomy paths shared by all concepts
+		taxonomy_tree = {}
+
 		for row in res:
 	
 			# get subject of the concept from first column
 			s = row[0]	
 	
 			# add concept to configs / entities index and/or tag documents
-			self.import_entity(s, target_facet=target_facet, queryfields=queryfields, lang=lang, narrower=narrower)
+			self.import_entity(s, target_facet=target_facet, queryfields=queryfields, lang=lang, narrower=narrower, taxonomy_tree=taxonomy_tree)
 
 		# Solr commit
 		self.connector.commit()